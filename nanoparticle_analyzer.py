@@ -15,11 +15,33 @@
 # Author: Gemini AI (based on user's iterative development)
 # Date: October 15, 2025
 
+import os
+import numpy as np
 import pandas as pd
 import re
-from collections import defaultdict, Counter
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 import unicodedata
 
+try:
+    # Optional: faster multi-pattern matching (pip install pyahocorasick)
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    # Optional: multithreaded detection in Rust (pip install polars)
+    import polars as pl
+except ImportError:
+    pl = None
+
+try:
+    # Optional: multithreaded CSV parsing (pip install pyarrow)
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
 # ==============================================================================
 # --- 1. USER CONFIGURATION ---
 # ==============================================================================
@@ -31,22 +53,23 @@ CSV_FILENAME = 'THNF575.csv'
 # The dictionary mapping canonical nanoparticle names to their search variations.
 # This is the "brain" of the search. Add or remove nanoparticles as needed.
 # Format: 'Canonical Name': ['search_term_1', 'search_term_2', ...],
+# Search terms are plain text, matched as whole words regardless of case.
 NANOPARTICLE_MAP = {
-    'Alumina': [r'Al2O3', r'aluminum oxide', r'alumina'],
-    'Titania': [r'TiO2', r'titanium dioxide', r'titania'],
-    'Silica': [r'SiO2', r'silicon dioxide', r'silica'],
-    'Copper Oxide': [r'CuO', r'cupric oxide', r'copper oxide'],
-    'Zinc Oxide': [r'ZnO', r'zinc oxide'],
-    'Magnetite': [r'Fe3O4', r'magnetite', r'iron oxide'],
-    'Zirconia': [r'ZrO2', r'zirconium dioxide', r'zirconia'],
-    'Graphene': [r'graphene', r'graphene nanoplatelets', r'GNP', 'graphene oxide', 'GO'],
-    'Carbon Nanotube': [r'carbon nanotube', r'CNT', r'SWCNT', 'MWCNT'],
-    'Diamond': [r'diamond', r'nano-diamond'],
-    'Silver': [r'silver', r'Ag'],
-    'Copper': [r'copper', 'Cu'],
-    'Gold': [r'gold', 'Au'],
-    'MXene': [r'mxene', r'ti3c2tx'],
-    'Molybdenum Disulfide': [r'MoS2', r'molybdenum disulfide'],
+    'Alumina': ['Al2O3', 'aluminum oxide', 'alumina'],
+    'Titania': ['TiO2', 'titanium dioxide', 'titania'],
+    'Silica': ['SiO2', 'silicon dioxide', 'silica'],
+    'Copper Oxide': ['CuO', 'cupric oxide', 'copper oxide'],
+    'Zinc Oxide': ['ZnO', 'zinc oxide'],
+    'Magnetite': ['Fe3O4', 'magnetite', 'iron oxide'],
+    'Zirconia': ['ZrO2', 'zirconium dioxide', 'zirconia'],
+    'Graphene': ['graphene', 'graphene nanoplatelets', 'GNP', 'graphene oxide', 'GO'],
+    'Carbon Nanotube': ['carbon nanotube', 'CNT', 'SWCNT', 'MWCNT'],
+    'Diamond': ['diamond', 'nano-diamond'],
+    'Silver': ['silver', 'Ag'],
+    'Copper': ['copper', 'Cu'],
+    'Gold': ['gold', 'Au'],
+    'MXene': ['mxene', 'ti3c2tx'],
+    'Molybdenum Disulfide': ['MoS2', 'molybdenum disulfide'],
 }
 
 # The dictionary for mapping names to their LaTeX chemical formulas for the table.
@@ -58,21 +81,31 @@ LATEX_SYMBOL_MAP = {
     'MXene': r'MXene', 'Molybdenum Disulfide': r'\ce{MoS2}',
 }
 
+# Articles are scanned in parallel worker processes once the CSV has at least this many rows.
+# Smaller files are scanned in this process, since starting workers would cost more than it saves.
+PARALLEL_MIN_ARTICLES = 5000
+
 # ==============================================================================
 # --- 2. HELPER FUNCTIONS ---
 # ==============================================================================
 
+# Translation table escaping characters that have special meaning in BibTeX
+_BIB_ESCAPE = str.maketrans({'&': r'\&', '%': r'\%', '$': r'\$', '#': r'\#', '_': r'\_', '{': r'\{', '}': r'\}'})
+
 def sanitize_text(text):
     """Removes or escapes special characters to prevent BibTeX errors."""
     if not isinstance(text, str):
         return ''
-    # Normalize unicode to closest ASCII representation (e.g., accents)
-    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('utf-8')
+    return _sanitize_text_str(text)
+
+@lru_cache(maxsize=None)
+def _sanitize_text_str(text):
+    """Cached worker for sanitize_text; authors and titles are sanitized more than once."""
+    # Normalize unicode to closest ASCII representation (e.g., accents); pure ASCII is already normalized
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('utf-8')
     # Escape characters that have special meaning in BibTeX
-    replacements = {'&': r'\&', '%': r'\%', '$': r'\$', '#': r'\#', '_': r'\_', '{': r'\{', '}': r'\}'}
-    for char, escaped_char in replacements.items():
-        text = text.replace(char, escaped_char)
-    return text
+    return text.translate(_BIB_ESCAPE)
 
 def generate_bib_key(authors, year, title):
     """Generates a unique citation key (e.g., 'author2023title') for an article."""
@@ -95,6 +128,144 @@ def generate_bib_key(authors, year, title):
         # Fallback for entries with missing or unusual data
         return f"ref_{abs(hash(title))}"
 
+def build_nanoparticle_pattern(nanoparticle_map):
+    """Builds one regex that finds every nanoparticle variation in a single pass over lowercased text.
+
+    Returns the compiled pattern and a dict mapping each named group to the bitmask
+    of canonical names it stands for (bit j is the j-th name in nanoparticle_map).
+    Since a single pass never reports overlapping matches, a variation also stands
+    for any other name found inside it (e.g. 'copper oxide' counts as both
+    'Copper Oxide' and 'Copper').
+    """
+    name_patterns = [
+        re.compile(r'\b(?:' + '|'.join(re.escape(v.lower()) for v in variations) + r')\b')
+        for variations in nanoparticle_map.values()
+    ]
+    # Try longer variations first so e.g. 'graphene oxide' is preferred over 'graphene'
+    variations = sorted(dict.fromkeys(v.lower() for vs in nanoparticle_map.values() for v in vs), key=len, reverse=True)
+    group_to_mask = {}
+    alternatives = []
+    for i, variation in enumerate(variations):
+        group = f'v{i}'
+        group_to_mask[group] = sum(1 << j for j, pattern in enumerate(name_patterns) if pattern.search(variation))
+        alternatives.append(f'(?P<{group}>{re.escape(variation)})')
+    pattern = re.compile(r'\b(?:' + '|'.join(alternatives) + r')\b')
+    return pattern, group_to_mask
+
+def build_nanoparticle_automaton(nanoparticle_map):
+    """Builds an Aho-Corasick automaton over the lowercased nanoparticle variations.
+
+    Each word maps to a (length, bitmask) tuple so matches can be checked for word
+    boundaries; bit j of the bitmask is the j-th name in nanoparticle_map.
+    """
+    variation_masks = defaultdict(int)
+    for j, variations in enumerate(nanoparticle_map.values()):
+        for v in variations:
+            variation_masks[v.lower()] |= 1 << j
+    automaton = ahocorasick.Automaton()
+    for variation, mask in variation_masks.items():
+        automaton.add_word(variation, (len(variation), mask))
+    automaton.make_automaton()
+    return automaton
+
+def is_word_boundary(text, i):
+    """Returns True if position i in text is a word boundary, with the same meaning as regex '\\b'."""
+    before = i > 0 and (text[i - 1].isalnum() or text[i - 1] == '_')
+    after = i < len(text) and (text[i].isalnum() or text[i] == '_')
+    return before != after
+
+def build_nanoparticle_finder(nanoparticle_map):
+    """Returns a function that finds the canonical nanoparticle names mentioned in a lowercased text.
+
+    The function returns a bitmask where bit j is set if the j-th name in
+    nanoparticle_map was found. Uses an Aho-Corasick automaton when pyahocorasick is installed, and the
+    fused regex from build_nanoparticle_pattern otherwise.
+    """
+    if ahocorasick is not None:
+        automaton = build_nanoparticle_automaton(nanoparticle_map)
+
+        def find_nanoparticles(lowered_text):
+            found = 0
+            for end, (length, mask) in automaton.iter(lowered_text):
+                start = end - length + 1
+                if is_word_boundary(lowered_text, start) and is_word_boundary(lowered_text, end + 1):
+                    found |= mask
+            return found
+    else:
+        pattern, group_to_mask = build_nanoparticle_pattern(nanoparticle_map)
+
+        def find_nanoparticles(lowered_text):
+            found = 0
+            # Find every variation in the text in a single pass
+            for match in pattern.finditer(lowered_text):
+                found |= group_to_mask[match.lastgroup]
+            return found
+
+    return find_nanoparticles
+
+# Finder used by each worker process, built once by _init_scan_worker
+_worker_find_nanoparticles = None
+
+def _init_scan_worker(nanoparticle_map):
+    """Builds the nanoparticle finder once per worker process."""
+    global _worker_find_nanoparticles
+    _worker_find_nanoparticles = build_nanoparticle_finder(nanoparticle_map)
+
+def scan_chunk(texts):
+    """Finds the nanoparticles in each lowercased text of a chunk (runs in a worker process)."""
+    return np.fromiter((_worker_find_nanoparticles(text) for text in texts), dtype=np.int64, count=len(texts))
+
+# Python's regex word characters (str.isalnum() or '_') as Rust regex classes
+_RUST_WORD_CHAR = r'[\p{L}\p{N}_]'
+_RUST_NON_WORD_CHAR = r'[^\p{L}\p{N}_]'
+
+def rust_whole_word_pattern(variation):
+    """Returns a Rust regex matching variation with Python's '\\b' semantics on both sides.
+
+    Rust's own '\\b' disagrees with Python's re on some characters: it treats
+    combining marks as word characters and superscript digits as not.
+    """
+    is_word_char = lambda c: c.isalnum() or c == '_'
+    before = f'(?:^|{_RUST_NON_WORD_CHAR})' if is_word_char(variation[0]) else _RUST_WORD_CHAR
+    after = f'(?:{_RUST_NON_WORD_CHAR}|$)' if is_word_char(variation[-1]) else _RUST_WORD_CHAR
+    return before + re.escape(variation) + after
+
+def find_nanoparticles_with_polars(texts, nanoparticle_map):
+    """Returns the bitmask of nanoparticles found in each lowercased text, computed by Polars.
+
+    Each nanoparticle is one str.contains expression; Polars evaluates them
+    with Rust's regex engine on all cores. Word boundaries are spelled out
+    with rust_whole_word_pattern so results match the other finders.
+    """
+    bits = [
+        pl.col('text').str.contains('|'.join(rust_whole_word_pattern(v.lower()) for v in variations)).cast(pl.Int64) * (1 << j)
+        for j, variations in enumerate(nanoparticle_map.values())
+    ]
+    frame = pl.DataFrame({'text': texts}, schema={'text': pl.Utf8})
+    return frame.select(pl.sum_horizontal(bits)).to_series().to_numpy()
+
+def find_nanoparticles_in_texts(texts, nanoparticle_map):
+    """Returns a NumPy int64 array with the bitmask of nanoparticles found in each lowercased text.
+
+    Uses Polars when it is installed. Otherwise large inputs are split into one
+    chunk per CPU and scanned in worker processes.
+    """
+    if len(nanoparticle_map) > 63:
+        raise ValueError(f"At most 63 nanoparticles are supported, got {len(nanoparticle_map)}.")
+
+    if pl is not None:
+        return find_nanoparticles_with_polars(texts, nanoparticle_map)
+
+    workers = os.cpu_count() or 1
+    if len(texts) < PARALLEL_MIN_ARTICLES or workers == 1:
+        find_nanoparticles = build_nanoparticle_finder(nanoparticle_map)
+        return np.fromiter((find_nanoparticles(text) for text in texts), dtype=np.int64, count=len(texts))
+
+    chunk_size = -(-len(texts) // workers)  # Ceiling division
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_scan_worker, initargs=(nanoparticle_map,)) as executor:
+        return np.concatenate(list(executor.map(scan_chunk, chunks)))
+
 # ==============================================================================
 # --- 3. MAIN ANALYSIS LOGIC ---
 # ==============================================================================
@@ -103,7 +274,16 @@ def analyze_literature():
     """Main function to perform the entire analysis and generate output files."""
     # --- Load Data ---
     try:
-        df = pd.read_csv(CSV_FILENAME)
+        df = pd.read_csv(CSV_FILENAME, engine='pyarrow' if pyarrow is not None else 'c')
+        # Unlike the C engine, pyarrow keeps blank headers (e.g. trailing commas) as '' columns
+        # and doesn't rename repeated headers, so drop the former and number the latter ('X', 'X.1')
+        df = df.loc[:, df.columns.astype(str).str.strip() != '']
+        header_counts = defaultdict(int)
+        renamed_columns = []
+        for column in df.columns:
+            renamed_columns.append(column if header_counts[column] == 0 else f"{column}.{header_counts[column]}")
+            header_counts[column] += 1
+        df.columns = renamed_columns
         print(f"✅ Successfully loaded '{CSV_FILENAME}'. Found {len(df)} articles.")
     except FileNotFoundError:
         print(f"❌ Error: File not found. Please make sure '{CSV_FILENAME}' is in the same directory as the script.")
@@ -111,42 +291,55 @@ def analyze_literature():
 
     # --- Pre-process Data and Generate Unique BibTeX Keys ---
     bib_keys = []
+    used_keys = set()
     seen_keys_count = defaultdict(int)
-    for index, row in df.iterrows():
-        base_key = generate_bib_key(row.get('Authors'), row.get('Year'), row.get('Title'))
+    for authors, year, title in zip(df['Authors'].to_numpy(), df['Year'].to_numpy(), df['Title'].to_numpy()):
+        base_key = generate_bib_key(authors, year, title)
         count = seen_keys_count[base_key]
-        seen_keys_count[base_key] += 1
         # If key is a duplicate, append a number (e.g., author2023title2)
         unique_key = base_key if count == 0 else f"{base_key}{count+1}"
+        # A numbered key can clash with another article's base key, so keep counting until it is free
+        while unique_key in used_keys:
+            count += 1
+            unique_key = f"{base_key}{count+1}"
+        seen_keys_count[base_key] = count + 1
+        used_keys.add(unique_key)
         bib_keys.append(unique_key)
     df['bib_key'] = bib_keys
     
     # Combine text fields for a comprehensive search
     text_columns = ['Title', 'Abstract', 'Keywords', 'Index Keywords']
-    df['combined_text'] = df[text_columns].fillna('').agg(' '.join, axis=1)
+    parts = [df[c].fillna('').astype(str) for c in text_columns]
+    df['combined_text'] = parts[0].str.cat(parts[1:], sep=' ')
+    # Lowercase once here so the matchers don't need to case-fold per variation
+    df['combined_text_lower'] = df['combined_text'].str.lower()
 
     # --- Identify Nanoparticle Combinations in Each Article ---
-    combination_keys = defaultdict(list)
-    article_counts = Counter()
-
-    for index, row in df.iterrows():
-        nanoparticles_found = set()
-        for name, variations in NANOPARTICLE_MAP.items():
-            # Check if any variation exists in the article's text (case-insensitive)
-            if any(re.search(r'\b' + re.escape(v) + r'\b', row['combined_text'], re.IGNORECASE) for v in variations):
-                nanoparticles_found.add(name)
-        
-        num_found = len(nanoparticles_found)
-        if num_found > 0:
-            # Store the combination and its citation key
-            combo_key = tuple(sorted(list(nanoparticles_found)))
-            combination_keys[combo_key].append(row['bib_key'])
-            
-            # Update summary statistics
-            if num_found == 1: article_counts['mono'] += 1
-            elif num_found == 2: article_counts['binary'] += 1
-            elif num_found == 3: article_counts['ternary'] += 1
-            else: article_counts['other'] += 1
+    # Scan the whole column at once instead of building a Series per row
+    # Each combination is a bitmask where bit j marks the j-th name in NANOPARTICLE_MAP
+    bitmasks = find_nanoparticles_in_texts(df['combined_text_lower'].tolist(), NANOPARTICLE_MAP)
+    has_nanoparticles = bitmasks > 0
+
+    # Group citation keys by combination, keeping combinations in order of first appearance
+    keys_by_bitmask = df.loc[has_nanoparticles, 'bib_key'].groupby(bitmasks[has_nanoparticles], sort=False).agg(list)
+    # Decode only the combinations that actually occur
+    names = list(NANOPARTICLE_MAP)
+    combination_keys = {
+        tuple(sorted(name for j, name in enumerate(names) if int(bitmask) >> j & 1)): keys
+        for bitmask, keys in keys_by_bitmask.items()
+    }
+
+    # Summary statistics by the number of nanoparticles found (set bits in the bitmask)
+    counts_by_size = defaultdict(int)
+    distinct_bitmasks, bitmask_counts = np.unique(bitmasks, return_counts=True)
+    for bitmask, count in zip(distinct_bitmasks.tolist(), bitmask_counts.tolist()):
+        counts_by_size[bin(bitmask).count('1')] += count
+    article_counts = {
+        'mono': counts_by_size.get(1, 0),
+        'binary': counts_by_size.get(2, 0),
+        'ternary': counts_by_size.get(3, 0),
+        'other': sum(count for size, count in counts_by_size.items() if size >= 4),
+    }
 
     # --- Sort and Prepare Data for LaTeX Table ---
     table_data = sorted(
@@ -156,41 +349,44 @@ def analyze_literature():
     )
 
     # --- Generate LaTeX Table Rows ---
-    latex_table_rows = []
-    all_ordered_cite_keys = []
-    for item in table_data:
+    latex_table_rows = [None] * len(table_data)
+    unique_ordered_keys = [] # Citation keys in order of first appearance in the table
+    seen_cite_keys = set()
+    for i, item in enumerate(table_data):
         latex_combo_str = ' + '.join([LATEX_SYMBOL_MAP.get(name, name) for name in item['combo']])
         cite_str = r'\cite{' + ','.join(item['keys']) + '}'
-        latex_table_rows.append(f"  {latex_combo_str} & {item['freq']} & {cite_str} \\\\ \\hline")
-        all_ordered_cite_keys.extend(item['keys'])
-    
-    unique_ordered_keys = list(dict.fromkeys(all_ordered_cite_keys)) # Remove duplicates while preserving order
+        latex_table_rows[i] = f"  {latex_combo_str} & {item['freq']} & {cite_str} \\\\ \\hline"
+        for key in item['keys']:
+            if key not in seen_cite_keys:
+                seen_cite_keys.add(key)
+                unique_ordered_keys.append(key)
 
     # --- Generate BibTeX (.bib) File Content ---
-    final_bib_content = []
-    key_to_article_map = df.set_index('bib_key')
-    for key in unique_ordered_keys:
+    # Entries are written by index; any that fail stay None and are skipped when saving
+    final_bib_content = [None] * len(unique_ordered_keys)
+    # Plain dict lookups avoid building a Series for every entry
+    key_to_article_map = df.set_index('bib_key').to_dict('index')
+    for i, key in enumerate(unique_ordered_keys):
         try:
-            article = key_to_article_map.loc[key]
+            article = key_to_article_map[key]
             pages = f"{int(article['Page start'])}--{int(article['Page end'])}" if pd.notna(article['Page start']) and pd.notna(article['Page end']) else ''
             
-            entry = (f"@article{{{key},\n"
-                     f"  title={{{sanitize_text(article.get('Title', ''))}}},\n"
-                     f"  author={{{sanitize_text(article.get('Authors', '')).replace(',', ' and')}}},\n"
-                     f"  journal={{{sanitize_text(article.get('Source title', ''))}}},\n"
-                     f"  volume={{{str(article.get('Volume', ''))}}},\n"
-                     f"  pages={{{pages}}},\n"
-                     f"  year={{{int(article.get('Year', 0))}}},\n"
-                     f"  publisher={{{sanitize_text(article.get('Publisher', ''))}}},\n"
-                     f"  doi={{{article.get('DOI', '')}}}\n"
-                     f"}}")
-            final_bib_content.append(entry)
+            final_bib_content[i] = (f"@article{{{key},\n"
+                                    f"  title={{{sanitize_text(article.get('Title', ''))}}},\n"
+                                    f"  author={{{sanitize_text(article.get('Authors', '')).replace(',', ' and')}}},\n"
+                                    f"  journal={{{sanitize_text(article.get('Source title', ''))}}},\n"
+                                    f"  volume={{{str(article.get('Volume', ''))}}},\n"
+                                    f"  pages={{{pages}}},\n"
+                                    f"  year={{{int(article.get('Year', 0))}}},\n"
+                                    f"  publisher={{{sanitize_text(article.get('Publisher', ''))}}},\n"
+                                    f"  doi={{{article.get('DOI', '')}}}\n"
+                                    f"}}")
         except Exception as e:
             print(f"⚠️ Warning: Could not create BibTeX entry for key {key}. Error: {e}")
 
     # --- Save Output Files ---
     with open('references.bib', 'w', encoding='utf-8') as f:
-        f.write('\n\n'.join(final_bib_content))
+        f.write('\n\n'.join(entry for entry in final_bib_content if entry is not None))
     
     with open('latex_table.tex', 'w', encoding='utf-8') as f:
         f.write('\n'.join(latex_table_rows))